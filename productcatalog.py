@@ -1,16 +1,56 @@
+import hashlib
+import html
+import io
+import zipfile
+from collections import namedtuple
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
 import pandas as pd
-from datetime import datetime
-from openpyxl import load_workbook
 
 # Page configuration for layout
 st.set_page_config(page_title="Product Catalog", layout="wide")
 
+# Column types applied while reading, so the cleaning passes below have less to do.
+# Text columns are stored as Arrow-backed strings; the other columns keep the default backend
+# because dtype_backend='pyarrow' rejects columns that mix numbers and text, such as 'Stock'.
+READ_DTYPES = {
+    'Product Name': 'string[pyarrow]',
+    'Category': 'category',
+    'Features': 'string[pyarrow]',
+    'Image URL': 'string[pyarrow]',
+    'Product ID': 'string[pyarrow]',
+}
+
+# Function to open the workbook once, preferring the Rust-backed calamine engine (pandas >= 2.2)
+def open_workbook(uploaded_file):
+    try:
+        return pd.ExcelFile(uploaded_file, engine='calamine')
+    except ImportError:
+        # python-calamine is not installed, fall back to openpyxl
+        uploaded_file.seek(0)
+    # Read-only mode streams the sheet without building openpyxl's styled cell model
+    return pd.ExcelFile(
+        uploaded_file,
+        engine='openpyxl',
+        engine_kwargs={'read_only': True, 'data_only': True, 'keep_links': False},
+    )
+
+# Function to read the product sheet; further sheets can be parsed from the same open workbook
+def read_workbook(uploaded_file):
+    with open_workbook(uploaded_file) as workbook:
+        return workbook.parse(workbook.sheet_names[0], dtype=READ_DTYPES)
+
 # Function to load data from Excel
-@st.cache_data
 def load_data(uploaded_file):
+    # calamine is strict about file conformance, so reject anything that is not an xlsx archive up front
+    if not zipfile.is_zipfile(uploaded_file):
+        st.error("The uploaded file is not a valid .xlsx workbook.")
+        st.stop()
+    uploaded_file.seek(0)
     try:
-        data = pd.read_excel(uploaded_file, engine='openpyxl')
+        data = read_workbook(uploaded_file)
         if data.empty:
             st.error("The uploaded Excel file is empty.")
             st.stop()
@@ -19,45 +59,222 @@ def load_data(uploaded_file):
         st.error(f"An error occurred while loading the data: {e}")
         st.stop()
 
-# File uploader
-uploaded_file = st.sidebar.file_uploader("Upload Excel File", type=["xlsx"])
-if not uploaded_file:
-    st.stop()
+# Numeric columns converted together in clean_data
+NUMERIC_COLUMNS = ('Price', 'Discount', 'Rating', 'Stock')
+
+# Function to clean and type the product columns. The numeric filter columns are
+# converted to NumPy dtypes so the Arrow filter table can be built from them directly.
+def clean_data(products):
+    # Strip currency symbols and separators from 'Price', only when it was read as text
+    price = products['Price']
+    if not pd.api.types.is_numeric_dtype(price):
+        price = price.astype(str).str.replace(r'[$,]', '', regex=True)
+
+    # Map stock text such as 'In Stock' to 1, used where 'Stock' is not a number
+    in_stock_text = products['Stock'].astype('string').str.strip().str.lower().eq('in stock').fillna(False)
+
+    # Coerce the numeric columns once, invalid values become NaN
+    numeric = {
+        col: pd.to_numeric(price if col == 'Price' else products[col], errors='coerce').astype('float64')
+        for col in NUMERIC_COLUMNS
+    }
+
+    products = products.assign(
+        Price=numeric['Price'],
+        # 'Discount' is in decimal format, shown as a percentage
+        Discount=numeric['Discount'].fillna(0) * 100,
+        Rating=numeric['Rating'].fillna(0),
+        Stock=numeric['Stock'].fillna(in_stock_text.astype('int32')),
+        # Store 'Category' as categorical so filtering and listing work on integer codes
+        Category=products['Category'].astype('category'),
+        # Fill missing or invalid dates with a fallback
+        **{'Launch Date': pd.to_datetime(products['Launch Date'], errors='coerce').fillna(pd.Timestamp('2000-01-01'))},
+    ).astype({'Stock': 'int32'})
+
+    # Availability flag computed once, reused by the stock filter and the product cards
+    products['_in_stock'] = products['Stock'] > 0
+    return products
+
+# Columns the Arrow filter table holds
+FILTER_COLUMNS = ['Price', 'Discount', 'Rating', 'Launch Date', '_in_stock']
+
+# Range-filtered columns whose exact bounds are kept on the Catalog
+RANGE_COLUMNS = ('Price', 'Discount', 'Rating', 'Launch Date')
+
+# Function to test whether a range covers every value of a column, so its predicate can be skipped.
+# Columns with missing values never qualify, since their predicate also drops those rows.
+def covers_column(catalog, col, low, high=None):
+    if col not in catalog.value_ranges:
+        return False
+    col_min, col_max = catalog.value_ranges[col]
+    return low <= col_min and (high is None or col_max <= high)
+
+# Function to filter a PresortedCatalog by AppliedFilters; masking keeps the row order, so no sort is needed afterwards.
+# The range predicates run as pyarrow.compute kernels over the cached Arrow filter table, and predicates that cannot
+# exclude any row are skipped. With default filters the shared presorted frame itself is returned, so callers must
+# not modify the result.
+def filter_products(catalog, presorted, filters):
+    products, filter_table = presorted.df, presorted.filter_table
+    price_range, discount_range, rating = filters.price_range, filters.discount_range, filters.rating
+    start_date, end_date = pd.to_datetime(filters.launch_date_range[0]), pd.to_datetime(filters.launch_date_range[1])
+
+    predicates = []
+    if not (catalog.category_complete and set(filters.categories) >= set(catalog.categories_sorted)):
+        # Look up each row's category code in a table of selected codes instead of hashing every row's string.
+        # The extra last slot stays False, so missing categories (code -1) never match.
+        selected = pd.Index(catalog.categories_sorted).get_indexer(filters.categories)
+        lookup = np.zeros(len(catalog.categories_sorted) + 1, dtype=bool)
+        lookup[selected[selected >= 0]] = True
+        predicates.append(pa.array(lookup[presorted.category_codes]))
+    if not covers_column(catalog, 'Price', *price_range):
+        predicates += [pc.greater_equal(filter_table['Price'], price_range[0]), pc.less_equal(filter_table['Price'], price_range[1])]
+    if not covers_column(catalog, 'Discount', *discount_range):
+        predicates += [pc.greater_equal(filter_table['Discount'], discount_range[0]), pc.less_equal(filter_table['Discount'], discount_range[1])]
+    if not covers_column(catalog, 'Rating', rating):
+        predicates.append(pc.greater_equal(filter_table['Rating'], rating))
+    if not covers_column(catalog, 'Launch Date', start_date, end_date):
+        predicates += [
+            pc.greater_equal(filter_table['Launch Date'], start_date.to_pydatetime()),
+            pc.less_equal(filter_table['Launch Date'], end_date.to_pydatetime()),
+        ]
+    if filters.in_stock:
+        predicates.append(filter_table['_in_stock'])
+
+    if not predicates:
+        return products
+    mask = predicates[0]
+    for predicate in predicates[1:]:
+        mask = pc.and_(mask, predicate)
+
+    # Missing prices compare as null, which excludes the row like NaN did
+    return products[pc.fill_null(mask, False).to_numpy(zero_copy_only=False)]
 
-# Load product data
-products = load_data(uploaded_file)
+# Filters and sort key captured when Apply Filters is clicked
+AppliedFilters = namedtuple('AppliedFilters', [
+    'categories', 'price_range', 'discount_range', 'rating', 'launch_date_range', 'in_stock', 'sort_by',
+])
 
-# Ensure necessary columns are present
+# Products sorted by one sort key, with the category codes and Arrow filter table in the same row order
+PresortedCatalog = namedtuple('PresortedCatalog', ['df', 'category_codes', 'filter_table'])
+
+# Cleaned products together with the sidebar widget options and bounds, computed once per file
+Catalog = namedtuple('Catalog', [
+    'df', 'price_min', 'price_max', 'discount_min', 'discount_max', 'date_min', 'date_max', 'categories_sorted',
+    'value_ranges', 'category_complete',
+])
+
+# Columns the catalog needs to render
 required_columns = ['Product Name', 'Category', 'Price', 'Discount', 'Stock', 'Rating', 'Features', 'Image URL', 'Launch Date', 'Product ID']
-for col in required_columns:
-    if col not in products.columns:
-        st.error(f"Missing required column: {col}")
+
+# Number of uploaded files whose catalog and derived objects stay cached, shared by all sessions
+MAX_CACHED_UPLOADS = 4
+
+# Sort options offered in the sidebar; one presorted copy is cached per option and upload
+SORT_OPTIONS = ['Price', 'Rating', 'Discount']
+
+# Function to read, validate and clean the uploaded workbook once per file, returning a Catalog.
+# The cache is keyed on the content digest only; the leading underscore keeps Streamlit from hashing the raw bytes.
+# st.cache_resource returns the cached Catalog itself rather than an unpickled copy, so it must be treated as read-only.
+@st.cache_resource(max_entries=MAX_CACHED_UPLOADS)
+def load_and_clean(digest, _file_bytes):
+    products = load_data(io.BytesIO(_file_bytes))
+
+    # Ensure necessary columns are present
+    for col in required_columns:
+        if col not in products.columns:
+            st.error(f"Missing required column: {col}")
+            st.stop()
+
+    # Data Cleaning
+    try:
+        products = clean_data(products)
+    except Exception as e:
+        st.error(f"An error occurred while processing the data: {e}")
         st.stop()
 
-# Data Cleaning
-try:
-    # Convert 'Price' column to numeric
-    products['Price'] = pd.to_numeric(products['Price'].replace({'\$': '', ',': ''}, regex=True), errors='coerce')
+    return Catalog(
+        df=products,
+        price_min=int(products['Price'].min()),
+        price_max=int(products['Price'].max()),
+        discount_min=int(products['Discount'].min()),
+        discount_max=int(products['Discount'].max()),
+        date_min=products['Launch Date'].min().date(),
+        date_max=products['Launch Date'].max().date(),
+        categories_sorted=products['Category'].cat.categories.tolist(),
+        # Exact bounds of the range-filtered columns that have no missing values
+        value_ranges={
+            col: (products[col].min(), products[col].max()) for col in RANGE_COLUMNS if not products[col].hasnans
+        },
+        category_complete=not products['Category'].hasnans,
+    )
 
-    # Convert 'Discount' column to numeric (assumes it's in decimal format)
-    products['Discount'] = pd.to_numeric(products['Discount'], errors='coerce') * 100
+# Function to sort the products by one of the sort options and build the filter helpers in the same row order,
+# cached so each key is sorted once per file. It is cached like load_and_clean, so the result is shared and read-only.
+@st.cache_resource(max_entries=MAX_CACHED_UPLOADS * len(SORT_OPTIONS))
+def presorted_catalog(digest, sort_by, _products):
+    products = _products.sort_values(by=sort_by, kind='stable')
+    return PresortedCatalog(
+        df=products,
+        category_codes=products['Category'].cat.codes.to_numpy(),
+        filter_table=pa.Table.from_pandas(products[FILTER_COLUMNS], preserve_index=False),
+    )
 
-    # Convert 'Launch Date' to datetime
-    products['Launch Date'] = pd.to_datetime(products['Launch Date'], errors='coerce')
+# HTML for a single product card: details on the left, image on the right
+PRODUCT_CARD = (
+    '<div style="display: flex; gap: 1rem; padding: 1rem 0; border-top: 1px solid rgba(128, 128, 128, 0.3);">'
+    '<div style="flex: 2;">'
+    '<h3>{name}</h3>'
+    '<p><b>Category:</b> {category}</p>'
+    '<p><b>Price:</b> ₹{price:.2f}</p>'
+    '<p><b>Discount:</b> {discount}%</p>'
+    '<p><b>Rating:</b> {rating} stars</p>'
+    '<p><b>Features:</b> {features}</p>'
+    '<p><b>Stock Available:</b> {stock}</p>'
+    '</div>'
+    '<div style="flex: 1; text-align: center;">{image}</div>'
+    '</div>'
+)
 
-    # Fill missing or invalid dates with a fallback
-    products['Launch Date'].fillna(pd.Timestamp('2000-01-01'), inplace=True)
+# Page sizes offered for the product list
+PAGE_SIZES = [10, 25, 50, 100]
 
-    # Handle missing or invalid values in 'Rating' and 'Discount'
-    products['Rating'].fillna(0, inplace=True)
-    products['Discount'].fillna(0, inplace=True)
+# Function to build the HTML card for one product record
+def render_product_card(row):
+    name = html.escape(str(row['Product Name']))
+    url = row['Image URL']
+    if pd.notna(url) and url.startswith('http'):
+        image = f'<img src="{html.escape(url)}" alt="{name}" loading="lazy" decoding="async" width="200" style="max-width: 100%; height: auto;"><br><small>{name}</small>'
+    else:
+        image = 'No Image Available'
+    return PRODUCT_CARD.format(
+        name=name,
+        category=html.escape(str(row['Category'])),
+        price=row['Price'],
+        discount=row['Discount'],
+        rating=row['Rating'],
+        features=html.escape(str(row['Features'])),
+        stock='Yes' if row['_in_stock'] else 'Out of Stock',
+        image=image,
+    )
+
+# Callback keeping the wishlist in sync with the wishlist picker
+def update_wishlist():
+    st.session_state.wishlist = st.session_state.wishlist_picker
 
-    # Convert 'Stock' to numeric and fill invalid values with 0
-    products['Stock'] = pd.to_numeric(products['Stock'], errors='coerce').fillna(0).astype(int)
-except Exception as e:
-    st.error(f"An error occurred while processing the data: {e}")
+# File uploader
+uploaded_file = st.sidebar.file_uploader("Upload Excel File", type=["xlsx"])
+if not uploaded_file:
     st.stop()
 
+# Load and clean product data, cached on a content digest computed once per upload so widget reruns skip parsing and cleaning
+if st.session_state.get('upload_id') != uploaded_file.file_id:
+    st.session_state.upload_id = uploaded_file.file_id
+    st.session_state.upload_digest = hashlib.blake2b(uploaded_file.getbuffer(), digest_size=16).hexdigest()
+    # Filters applied to a previous file do not carry over to a new one
+    st.session_state.pop('applied_filters', None)
+catalog = load_and_clean(st.session_state.upload_digest, uploaded_file.getvalue())
+products = catalog.df
+
 # App title and description
 st.title("🛍️ Product Catalog")
 st.subheader("Find the best products tailored to your needs.")
@@ -67,86 +284,83 @@ st.write("---")
 st.sidebar.header("Filter Products")
 
 # Category Filter
-categories = st.sidebar.multiselect('Category', options=sorted(products['Category'].dropna().unique()), default=sorted(products['Category'].dropna().unique()))
+categories = st.sidebar.multiselect('Category', options=catalog.categories_sorted, default=catalog.categories_sorted)
 
 # Price Range Filter
 price_range = st.sidebar.slider(
     'Price Range (₹)',
-    min_value=int(products['Price'].min()),
-    max_value=int(products['Price'].max()),
-    value=(int(products['Price'].min()), int(products['Price'].max()))
+    min_value=catalog.price_min,
+    max_value=catalog.price_max,
+    value=(catalog.price_min, catalog.price_max)
 )
 
 # Discount Filter
 discount_range = st.sidebar.slider(
     'Discount (%)',
-    min_value=int(products['Discount'].min()),
-    max_value=int(products['Discount'].max()),
-    value=(int(products['Discount'].min()), int(products['Discount'].max()))
+    min_value=catalog.discount_min,
+    max_value=catalog.discount_max,
+    value=(catalog.discount_min, catalog.discount_max)
 )
 
 # Rating Filter
 rating = st.sidebar.selectbox('Minimum Rating', options=[0, 1, 2, 3, 4, 5], index=5)
 
 # Launch Date Filter
-min_date = products['Launch Date'].min().date()
-max_date = products['Launch Date'].max().date()
-launch_date_range = st.sidebar.date_input('Launch Date Range', value=[min_date, max_date])
+launch_date_range = st.sidebar.date_input('Launch Date Range', value=[catalog.date_min, catalog.date_max])
 
 # Stock Availability Filter
 in_stock = st.sidebar.checkbox('Only show in-stock products', value=True)
 
 # Sort Options
-sort_by = st.sidebar.selectbox('Sort by', ['Price', 'Rating', 'Discount'])
+sort_by = st.sidebar.selectbox('Sort by', SORT_OPTIONS)
 
-# Apply Filters button
+# Apply Filters button, remembering the applied filters so paging and wishlist changes keep the results
 if st.sidebar.button('Apply Filters'):
-    # Apply filters to products
-    filtered_products = products[
-        (products['Category'].isin(categories)) &
-        (products['Price'].between(price_range[0], price_range[1])) &
-        (products['Discount'].between(discount_range[0], discount_range[1])) &
-        (products['Rating'] >= rating) &
-        (products['Launch Date'].between(pd.to_datetime(launch_date_range[0]), pd.to_datetime(launch_date_range[1]))) &
-        ((products['Stock'] > 0) if in_stock else True)
-    ]
-
-    # Sort the filtered products
-    filtered_products = filtered_products.sort_values(by=sort_by)
+    st.session_state.applied_filters = AppliedFilters(
+        categories=categories,
+        price_range=price_range,
+        discount_range=discount_range,
+        rating=rating,
+        launch_date_range=launch_date_range,
+        in_stock=in_stock,
+        sort_by=sort_by,
+    )
+
+if 'applied_filters' in st.session_state:
+    # Apply filters to the products presorted by the chosen key
+    applied_filters = st.session_state.applied_filters
+    presorted = presorted_catalog(st.session_state.upload_digest, applied_filters.sort_by, products)
+    filtered_products = filter_products(catalog=catalog, presorted=presorted, filters=applied_filters)
 
     # Display filtered products
     if filtered_products.empty:
         st.write("No products match your criteria.")
     else:
+        # Pagination, so only one window of products is rendered
+        total = len(filtered_products)
+        page_size = st.sidebar.select_slider('Page size', options=PAGE_SIZES, value=25)
+        page = st.sidebar.number_input('Page', min_value=1, max_value=max(1, -(-total // page_size)), value=1, step=1)
+        page_products = filtered_products.iloc[(page - 1) * page_size:page * page_size]
+
         st.subheader("Available Products")
-        for _, row in filtered_products.iterrows():
-            st.write("---")
-            col1, col2 = st.columns([2, 1])
-
-            # Left column for product details
-            with col1:
-                st.markdown(f"### {row['Product Name']}")
-                st.markdown(f"**Category:** {row['Category']}")
-                st.markdown(f"**Price:** ₹{row['Price']}")
-                st.markdown(f"**Discount:** {row['Discount']}%")
-                st.markdown(f"**Rating:** {row['Rating']} stars")
-                st.markdown(f"**Features:** {row['Features']}")
-                st.markdown(f"**Stock Available:** {'Yes' if row['Stock'] > 0 else 'Out of Stock'}")
-
-                # Add to wishlist button
-                if st.button(f"Add {row['Product Name']} to Wishlist", key=row['Product ID']):
-                    if 'wishlist' not in st.session_state:
-                        st.session_state.wishlist = []
-                    if row['Product Name'] not in st.session_state.wishlist:
-                        st.session_state.wishlist.append(row['Product Name'])
-                        st.success(f"{row['Product Name']} added to your Wishlist!")
-
-            # Right column for product image
-            with col2:
-                if pd.notna(row['Image URL']) and row['Image URL'].startswith('http'):
-                    st.image(row['Image URL'], caption=row['Product Name'], use_container_width=True)
-                else:
-                    st.text("No Image Available")
+        st.caption(f"Showing {len(page_products)} of {total} products")
+        records = page_products.to_dict('records')
+
+        # Render the page's product cards with a single markdown message
+        st.markdown("".join(render_product_card(row) for row in records), unsafe_allow_html=True)
+
+        # Wishlist picker for the products on this page, one widget instead of a button per product
+        st.write("---")
+        if 'wishlist' not in st.session_state:
+            st.session_state.wishlist = []
+        wishlist_options = list(dict.fromkeys(st.session_state.wishlist + [row['Product Name'] for row in records]))
+        st.multiselect(
+            'Add to Wishlist',
+            options=wishlist_options,
+            default=st.session_state.wishlist,
+            key='wishlist_picker',
+            on_change=update_wishlist,
+        )
 
 # Display Wishlist
 if st.sidebar.button("View Wishlist"):